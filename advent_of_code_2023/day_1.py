@@ -45,7 +45,12 @@ What is the sum of all of the calibration values?
 
 """
 
+import mmap
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 
 NUMBERS = {
@@ -70,22 +75,130 @@ NUMBERS = {
 }
 
 
+class CalibrationScanner:
+    def __init__(self, numbers: dict) -> None:
+        self.forward = build_automaton(numbers)
+        self.backward = build_automaton(
+            {number[::-1]: value for number, value in numbers.items()}
+        )
+
+    def first_number(self, line: str) -> str:
+        return scan(self.forward, line)
+
+    def last_number(self, line: str) -> str:
+        return scan(self.backward, reversed(line))
+
+    def calibration_value(self, line: str) -> int:
+        first = self.first_number(line)
+        if not first:
+            return 0
+        return int(first + self.last_number(line))
+
+
+def build_automaton(numbers: dict) -> tuple[list[dict], list[str]]:
+    # Aho-Corasick: trie transitions completed with the failure links, so a scan
+    # is a single dict lookup per character and never backtracks.
+    transitions: list[dict] = [{}]
+    outputs = [""]
+    for number, value in numbers.items():
+        state = 0
+        for char in number:
+            if char not in transitions[state]:
+                transitions.append({})
+                outputs.append("")
+                transitions[state][char] = len(transitions) - 1
+            state = transitions[state][char]
+        outputs[state] = value
+
+    failures = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+    while queue:
+        state = queue.popleft()
+        edges = transitions[state]
+        for char, next_state in edges.items():
+            failures[next_state] = transitions[failures[state]].get(char, 0)
+            if not outputs[next_state]:
+                outputs[next_state] = outputs[failures[next_state]]
+            queue.append(next_state)
+        transitions[state] = {**transitions[failures[state]], **edges}
+    return transitions, outputs
+
+
+def scan(automaton: tuple[list[dict], list[str]], line) -> str:
+    # No number is contained in another, so the first match to end is also the
+    # first one to start and the scan can stop there.
+    transitions, outputs = automaton
+    state = 0
+    for char in line:
+        state = transitions[state].get(char, 0)
+        if outputs[state]:
+            return outputs[state]
+    return ""
+
+
+SCANNER = CalibrationScanner(NUMBERS)
+BYTES_SCANNER = CalibrationScanner(
+    {number.encode(): value for number, value in NUMBERS.items()}
+)
+
+
 def read_input(file_name: str) -> list:
     with open(file_name, "r") as myfile:
         lines = [line.strip() for line in myfile]
     return lines
 
 
-def get_first_and_last_number(lines: list):
+def get_first_and_last_number(lines: list, scanner: CalibrationScanner = SCANNER):
     result = 0
     for line in lines:
-        number = get_numbers(line)
-        print(f"{line=}")
-        print(f"{number=}")
-        result += number
+        result += scanner.calibration_value(line)
     return result
 
 
+def find_chunk_boundaries(file_name: str, chunk_size: int) -> list[tuple[int, int]]:
+    size = os.path.getsize(file_name)
+    if size == 0:
+        return []
+    boundaries = []
+    with open(file_name, "rb") as myfile, mmap.mmap(
+        myfile.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        start = 0
+        while start < size:
+            end = data.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            boundaries.append((start, end))
+            start = end
+    return boundaries
+
+
+def sum_calibration_chunk(file_name: str, start: int, end: int) -> int:
+    result = 0
+    with open(file_name, "rb") as myfile, mmap.mmap(
+        myfile.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        position = start
+        while position < end:
+            line_end = data.find(b"\n", position, end)
+            if line_end == -1:
+                line_end = end
+            result += BYTES_SCANNER.calibration_value(data[position:line_end])
+            position = line_end + 1
+    return result
+
+
+def sum_calibration_file(
+    file_name: str, workers: int | None = None, chunk_size: int = 16 * 1024 * 1024
+) -> int:
+    boundaries = find_chunk_boundaries(file_name, chunk_size)
+    if not boundaries:
+        return 0
+    starts = [start for start, _ in boundaries]
+    ends = [end for _, end in boundaries]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(sum_calibration_chunk, repeat(file_name), starts, ends))
+
+
 def get_first_number_from_line(line: str) -> str:
     for char in line:
         result = check_if_character_is_number(char)
@@ -151,7 +264,7 @@ def get_last_number(line: str):
 
 
 if __name__ == "__main__":
-    input = read_input("input_day_1.txt")
+    input = read_input("input_files/input_day_1.txt")
     # input = [
     #     "617rdpbn6",
     #     # "dtlqxk5six",
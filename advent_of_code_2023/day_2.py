@@ -55,6 +55,16 @@ For each game, find the minimum set of cubes that must have been present. What i
 ANSWER: 86036
 """
 
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress, repeat
+from operator import and_, le, mul
+
+
+CUBES_PATTERN = re.compile(r"(\d+) (red|green|blue)")
+COLOR_BYTES = {ord("r"): 0, ord("g"): 1, ord("b"): 2}
+
 
 class Game:
     def __init__(self, id, red=0, green=0, blue=0) -> None:
@@ -72,6 +82,94 @@ class Game:
         return self.red * self.green * self.blue
 
 
+class GameRecords:
+    def __init__(self, games: list[Game]) -> None:
+        self.ids = array("I", (game.id for game in games))
+        self.red = array("H", (game.red for game in games))
+        self.green = array("H", (game.green for game in games))
+        self.blue = array("H", (game.blue for game in games))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def games(self) -> list[Game]:
+        return [
+            Game(*columns) for columns in zip(self.ids, self.red, self.green, self.blue)
+        ]
+
+    def feasible(self, max_red: int, max_green: int, max_blue: int):
+        return map(
+            and_,
+            map(le, self.red, repeat(max_red)),
+            map(
+                and_,
+                map(le, self.green, repeat(max_green)),
+                map(le, self.blue, repeat(max_blue)),
+            ),
+        )
+
+    def sum_feasible_ids(self, max_red: int, max_green: int, max_blue: int) -> int:
+        return sum(compress(self.ids, self.feasible(max_red, max_green, max_blue)))
+
+    def sum_powers(self) -> int:
+        return sum(map(mul, map(mul, self.red, self.green), self.blue))
+
+
+class FeasibilityIndex:
+    # Offline sweep over red with a Fenwick tree over green whose nodes hold
+    # Fenwick trees over the blue values inserted there, so a batch of Q limit
+    # triples against N games costs O((N + Q) log^2 N).
+    def __init__(self, games: list[Game]) -> None:
+        self.games = sorted(games, key=lambda game: game.red)
+        self.greens = sorted({game.green for game in games})
+        node_blues: list[set] = [set() for _ in range(len(self.greens) + 1)]
+        for game in games:
+            node = bisect_left(self.greens, game.green) + 1
+            while node <= len(self.greens):
+                node_blues[node].add(game.blue)
+                node += node & -node
+        self.node_blues = [sorted(blues) for blues in node_blues]
+
+    def query_batch(self, limits: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+        counts = [[0] * (len(blues) + 1) for blues in self.node_blues]
+        id_sums = [[0] * (len(blues) + 1) for blues in self.node_blues]
+        results = [(0, 0)] * len(limits)
+        inserted = 0
+        for query in sorted(range(len(limits)), key=lambda query: limits[query][0]):
+            max_red, max_green, max_blue = limits[query]
+            while inserted < len(self.games) and self.games[inserted].red <= max_red:
+                self.insert(self.games[inserted], counts, id_sums)
+                inserted += 1
+            results[query] = self.prefix(max_green, max_blue, counts, id_sums)
+        return results
+
+    def insert(self, game: Game, counts: list, id_sums: list) -> None:
+        node = bisect_left(self.greens, game.green) + 1
+        while node < len(self.node_blues):
+            blues = self.node_blues[node]
+            position = bisect_left(blues, game.blue) + 1
+            while position <= len(blues):
+                counts[node][position] += 1
+                id_sums[node][position] += game.id
+                position += position & -position
+            node += node & -node
+
+    def prefix(
+        self, max_green: int, max_blue: int, counts: list, id_sums: list
+    ) -> tuple[int, int]:
+        count = 0
+        id_sum = 0
+        node = bisect_right(self.greens, max_green)
+        while node > 0:
+            position = bisect_right(self.node_blues[node], max_blue)
+            while position > 0:
+                count += counts[node][position]
+                id_sum += id_sums[node][position]
+                position -= position & -position
+            node -= node & -node
+        return count, id_sum
+
+
 def read_input(file_name: str) -> list:
     with open(file_name, "r") as myfile:
         lines = [line.strip() for line in myfile]
@@ -102,6 +200,56 @@ def extract_game(line: str) -> tuple[int, list]:
     return game_id, results
 
 
+def extract_game_maxima(line: str) -> Game:
+    header, results_line = line.split(":", 1)
+    game = Game(int(header.split()[1]))
+    for count, color in CUBES_PATTERN.findall(results_line):
+        if int(count) > getattr(game, color):
+            setattr(game, color, int(count))
+    return game
+
+
+def read_game_records(lines: list) -> GameRecords:
+    return GameRecords([extract_game_maxima(line) for line in lines if line])
+
+
+def parse_game_maxima(line: bytes) -> tuple[int, int, int, int]:
+    game_id = 0
+    maxima = [0, 0, 0]
+    number = 0
+    for byte in line:
+        if 48 <= byte <= 57:
+            number = number * 10 + byte - 48
+        elif byte == 58:
+            game_id = number
+            number = 0
+        elif number and byte in COLOR_BYTES:
+            color = COLOR_BYTES[byte]
+            if number > maxima[color]:
+                maxima[color] = number
+            number = 0
+    return game_id, maxima[0], maxima[1], maxima[2]
+
+
+def iter_game_maxima(file_name: str):
+    with open(file_name, "rb") as myfile:
+        for line in myfile:
+            if not line.isspace():
+                yield parse_game_maxima(line)
+
+
+def solve_streaming(
+    file_name: str, max_red: int = 12, max_green: int = 13, max_blue: int = 14
+) -> tuple[int, int]:
+    feasible_ids = 0
+    powers = 0
+    for game_id, red, green, blue in iter_game_maxima(file_name):
+        if red <= max_red and green <= max_green and blue <= max_blue:
+            feasible_ids += game_id
+        powers += red * green * blue
+    return feasible_ids, powers
+
+
 def extract_colors(game_id: int, results: list):
     game = Game(game_id)
     for result in results:
@@ -63,7 +63,16 @@ What is the sum of all of the gear ratios in your engine schematic?
 ANSWER = 84907174
 """
 
+import os
 import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+
+
+MASK_TRANSLATION = str.maketrans("0123456789.", "00000000000")
+SYMBOL_PATTERN = re.compile(r"[^0]")
+NUMBER_PATTERN = re.compile(r"\d+")
 
 
 def read_input(file_name: str) -> list:
@@ -116,17 +125,40 @@ def check_if_symbol_surrounds_number(
     return False
 
 
+def get_symbol_mask_from_line(line: str) -> int:
+    if not line:
+        return 0
+    return int(SYMBOL_PATTERN.sub("1", line.translate(MASK_TRANSLATION))[::-1], 2)
+
+
+def dilate_masks(masks: list[int]) -> list[int]:
+    # Bit i of a row mask is column i, so shifting by one bit moves a symbol one
+    # column; bits shifted below column 0 fall off instead of wrapping around.
+    widened = [mask | mask << 1 | mask >> 1 for mask in masks]
+    padded = [0, *widened, 0]
+    return [
+        padded[index] | padded[index + 1] | padded[index + 2]
+        for index in range(len(masks))
+    ]
+
+
+def find_part_numbers(lines: list) -> list[int]:
+    symbol_zones = dilate_masks([get_symbol_mask_from_line(line) for line in lines])
+    result = []
+    for index, line in enumerate(lines):
+        zone = symbol_zones[index]
+        if not zone:
+            continue
+        for match in NUMBER_PATTERN.finditer(line):
+            start, end = match.span()
+            if zone & ((1 << (end - start)) - 1) << start:
+                result.append(int(match.group()))
+    return result
+
+
 def part1():
     lines = read_input("input_files/input_day_3.txt")
-    result = 0
-    for index, line in enumerate(lines):
-        numbers = get_numbers_from_line(line)
-        for item in numbers:
-            if check_if_symbol_surrounds_number(
-                lines, index, item["starting_index"], item["ending_index"]
-            ):
-                result += item["value"]
-    print(result)
+    print(sum(find_part_numbers(lines)))
 
 
 def find_all_asterisks_in_line(line: str):
@@ -161,20 +193,134 @@ def handle_asterisk(asterisk_index: int, current_line_index: int, lines: list):
     return numbers_next_to_asterisk
 
 
+class NumberIndex:
+    def __init__(self, lines: list) -> None:
+        self.width = max((len(line) for line in lines), default=0)
+        self.height = len(lines)
+        self.labels = array("i", [-1]) * (self.width * self.height)
+        self.values: list[int] = []
+        for row, line in enumerate(lines):
+            offset = row * self.width
+            for match in NUMBER_PATTERN.finditer(line):
+                start, end = match.span()
+                label = array("i", [len(self.values)]) * (end - start)
+                self.labels[offset + start : offset + end] = label
+                self.values.append(int(match.group()))
+
+    def get_adjacent_number_ids(self, row: int, column: int) -> set[int]:
+        ids = set()
+        first_column = max(column - 1, 0)
+        last_column = min(column + 2, self.width)
+        for neighbour_row in range(max(row - 1, 0), min(row + 2, self.height)):
+            offset = neighbour_row * self.width
+            ids.update(self.labels[offset + first_column : offset + last_column])
+        ids.discard(-1)
+        return ids
+
+    def find_symbol_neighbours(self, lines: list, symbols: str = "*"):
+        pattern = re.compile(f"[{re.escape(symbols)}]")
+        for row, line in enumerate(lines):
+            for match in pattern.finditer(line):
+                ids = sorted(self.get_adjacent_number_ids(row, match.start()))
+                yield row, match.start(), [self.values[number_id] for number_id in ids]
+
+
+def sum_gear_ratios(lines: list) -> int:
+    result = 0
+    for _, _, numbers in NumberIndex(lines).find_symbol_neighbours(lines, "*"):
+        if len(numbers) > 1:
+            result += prod(numbers)
+    return result
+
+
 def part2():
     lines = read_input("input_files/input_day_3.txt")
-    result = 0
-    for index, line in enumerate(lines):
-        asterisks = find_all_asterisks_in_line(line)
-        for asterisk in asterisks:
-            numbers_next_to_asterisk = handle_asterisk(asterisk, index, lines)
-            if len(numbers_next_to_asterisk) > 1:
-                mult = 1
-                for x in numbers_next_to_asterisk:
-                    mult = x["value"] * mult
-                result += mult
-    print(result)
-    return
+    print(sum_gear_ratios(lines))
+
+
+def iter_row_windows(rows):
+    # Keeps only three parsed rows alive: (line, numbers) above, at and below
+    # the row being evaluated, padded with empty rows at the edges.
+    empty_row: tuple[str, list[dict]] = ("", [])
+    window = [empty_row, empty_row]
+    index = -1
+    for line in rows:
+        line = line.strip()
+        window.append((line, get_numbers_from_line(line)))
+        if index >= 0:
+            yield index, window[0], window[1], window[2]
+        window.pop(0)
+        index += 1
+    if index >= 0:
+        yield index, window[0], window[1], empty_row
+
+
+def stream_schematic(rows):
+    for index, previous_row, current_row, next_row in iter_row_windows(rows):
+        window = (previous_row, current_row, next_row)
+        line, numbers = current_row
+        for item in numbers:
+            start = max(item["starting_index"] - 1, 0)
+            end = item["ending_index"] + 1
+            for row_line, _ in window:
+                if SYMBOL_PATTERN.search(
+                    row_line[start:end].translate(MASK_TRANSLATION)
+                ):
+                    yield "part", index, item["starting_index"], item["value"]
+                    break
+        for asterisk in find_all_asterisks_in_line(line):
+            adjacent_numbers = [
+                item["value"]
+                for _, row_numbers in window
+                for item in row_numbers
+                if item["starting_index"] <= asterisk + 1
+                and item["ending_index"] >= asterisk
+            ]
+            if len(adjacent_numbers) > 1:
+                yield "gear", index, asterisk, prod(adjacent_numbers)
+
+
+def solve_streaming(file_name: str) -> tuple[int, int]:
+    totals = {"part": 0, "gear": 0}
+    with open(file_name, "r") as myfile:
+        for kind, _, _, value in stream_schematic(myfile):
+            totals[kind] += value
+    return totals["part"], totals["gear"]
+
+
+def solve_band(
+    band: list, first_row: int, owned_start: int, owned_end: int
+) -> tuple[dict, dict]:
+    # The band carries one context row on each side; only rows it owns are kept,
+    # keyed by global coordinates so overlapping bands merge without duplicates.
+    results: dict[str, dict] = {"part": {}, "gear": {}}
+    for kind, row, column, value in stream_schematic(band):
+        row += first_row
+        if owned_start <= row < owned_end:
+            results[kind][(row, column)] = value
+    return results["part"], results["gear"]
+
+
+def solve_parallel(
+    lines: list, workers: int | None = None, band_height: int | None = None
+) -> tuple[int, int]:
+    if band_height is None:
+        band_height = max(-(-len(lines) // (workers or os.cpu_count() or 1)), 1)
+    owned_starts = list(range(0, len(lines), band_height))
+    owned_ends = [min(start + band_height, len(lines)) for start in owned_starts]
+    first_rows = [max(start - 1, 0) for start in owned_starts]
+    bands = [
+        lines[first_row : end + 1] for first_row, end in zip(first_rows, owned_ends)
+    ]
+    part_numbers: dict = {}
+    gear_ratios: dict = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for band_parts, band_gears in executor.map(
+            solve_band, bands, first_rows, owned_starts, owned_ends
+        ):
+            part_numbers.update(band_parts)
+            gear_ratios.update(band_gears)
+    return sum(part_numbers.values()), sum(gear_ratios.values())
 
 
 if __name__ == "__main__":
@@ -71,12 +71,18 @@ Process all of the original and copied scratchcards until no more scratchcards a
 ANSWER: 5554894
 """
 
+from array import array
+from itertools import repeat
+from operator import add, and_, lshift, mul, or_, rshift
+
 
 class Card:
     def __init__(self, id: int, winning_numbers: list, your_numbers: list) -> None:
         self.id = id
         self.winning_numbers = winning_numbers
         self.your_numbers = your_numbers
+        self.winning_mask = numbers_to_mask(winning_numbers)
+        self.your_mask = numbers_to_mask(your_numbers)
         self.wins: int = self.calculate_wins()
 
     def calculate_points(self) -> int:
@@ -86,10 +92,110 @@ class Card:
         return points
 
     def calculate_wins(self) -> int:
-        all_numbers = self.winning_numbers
-        all_numbers.extend(self.your_numbers)
-        all_numbers_set = set(all_numbers)
-        return len(all_numbers) - len(all_numbers_set)
+        return (self.winning_mask & self.your_mask).bit_count()
+
+
+def numbers_to_mask(numbers: list) -> int:
+    # Card numbers are 1-99, so each side of a card fits in one 128-bit mask.
+    mask = 0
+    for number in numbers:
+        mask |= 1 << int(number)
+    return mask
+
+
+DIGIT_TRANSLATION = bytes.maketrans(b" 0123456789", bytes([0, *range(10)]))
+
+
+class CardTable:
+    # Numbers are stored column-major: number k of card i is at k * len(ids) + i,
+    # so every column is a contiguous slice that map() can process in one pass.
+    def __init__(
+        self,
+        ids: array,
+        winning: array,
+        your_numbers: array,
+        winning_width: int,
+        your_width: int,
+    ) -> None:
+        self.ids = ids
+        self.winning = winning
+        self.your_numbers = your_numbers
+        self.winning_width = winning_width
+        self.your_width = your_width
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columns(self, numbers: array, width: int) -> list[array]:
+        size = len(self.ids)
+        return [numbers[index * size : (index + 1) * size] for index in range(width)]
+
+    def masks(self, numbers: array, width: int):
+        masks: list | map = [0] * len(self.ids)
+        for column in self.columns(numbers, width):
+            masks = map(or_, masks, map(lshift, repeat(1), column))
+        return masks
+
+    def calculate_wins(self) -> array:
+        return array(
+            "B",
+            map(
+                int.bit_count,
+                map(
+                    and_,
+                    self.masks(self.winning, self.winning_width),
+                    self.masks(self.your_numbers, self.your_width),
+                ),
+            ),
+        )
+
+    def calculate_points(self) -> int:
+        return sum(
+            map(rshift, map(lshift, repeat(1), self.calculate_wins()), repeat(1))
+        )
+
+    def card(self, index: int) -> Card:
+        size = len(self.ids)
+        return Card(
+            self.ids[index],
+            [str(number) for number in self.winning[index::size]],
+            [str(number) for number in self.your_numbers[index::size]],
+        )
+
+
+def read_fixed_width_column(
+    data: bytes, line_length: int, start: int, end: int, typecode: str = "B"
+) -> array:
+    values: list | map = [0] * (len(data) // line_length)
+    for column in range(start, end):
+        digits = data[column::line_length].translate(DIGIT_TRANSLATION)
+        values = map(add, map(mul, values, repeat(10)), digits)
+    return array(typecode, values)
+
+
+def load_card_table(file_name: str) -> CardTable:
+    with open(file_name, "rb") as myfile:
+        data = myfile.read().rstrip(b"\n") + b"\n"
+    line_length = data.index(b"\n") + 1
+    if len(data) % line_length:
+        raise ValueError("Scratchcard lines do not share a fixed-width layout")
+    colon = data.index(b":")
+    bar = data.index(b"|")
+    # Every number takes three bytes: a separating space and two digit columns.
+    winning_width = (bar - colon - 2) // 3
+    your_width = (line_length - 1 - bar) // 3
+    winning = array("B")
+    for index in range(winning_width):
+        start = colon + 2 + 3 * index
+        winning.extend(read_fixed_width_column(data, line_length, start, start + 2))
+    your_numbers = array("B")
+    for index in range(your_width):
+        start = bar + 2 + 3 * index
+        your_numbers.extend(
+            read_fixed_width_column(data, line_length, start, start + 2)
+        )
+    ids = read_fixed_width_column(data, line_length, len(b"Card "), colon, "I")
+    return CardTable(ids, winning, your_numbers, winning_width, your_width)
 
 
 def read_input(file_name: str) -> list:
@@ -108,6 +214,46 @@ def read_card_from_line(line: str) -> Card:
     return Card(card_id, winning_numbers, your_numbers)
 
 
+def parse_card_masks(line: bytes) -> tuple[int, int, int]:
+    card_id = 0
+    winning_mask = 0
+    your_mask = 0
+    side = -1
+    number = 0
+    for byte in line:
+        if 48 <= byte <= 57:
+            number = number * 10 + byte - 48
+            continue
+        if number:
+            if side < 0:
+                card_id = number
+            elif side == 0:
+                winning_mask |= 1 << number
+            else:
+                your_mask |= 1 << number
+            number = 0
+        if byte == 58:
+            side = 0
+        elif byte == 124:
+            side = 1
+    if number:
+        if side == 0:
+            winning_mask |= 1 << number
+        else:
+            your_mask |= 1 << number
+    return card_id, winning_mask, your_mask
+
+
+def read_card_wins(file_name: str) -> array:
+    wins = array("B")
+    with open(file_name, "rb") as myfile:
+        for line in myfile:
+            if not line.isspace():
+                _, winning_mask, your_mask = parse_card_masks(line)
+                wins.append((winning_mask & your_mask).bit_count())
+    return wins
+
+
 def part1():
     lines = read_input("input_files/input_day_4.txt")
     cards = [read_card_from_line(line) for line in lines]
@@ -117,16 +263,26 @@ def part1():
     print(result)
 
 
+def count_total_cards(wins: list[int]) -> int:
+    # Difference array over the card table: a card with n copies and w wins adds
+    # n copies to the next w cards, recorded as +n at the start and -n past the end.
+    copies_delta = [0] * (len(wins) + 1)
+    extra_copies = 0
+    total = 0
+    for index, card_wins in enumerate(wins):
+        extra_copies += copies_delta[index]
+        copies = extra_copies + 1
+        total += copies
+        if card_wins:
+            copies_delta[index + 1] += copies
+            copies_delta[min(index + 1 + card_wins, len(wins))] -= copies
+    return total
+
+
 def part2():
     lines = read_input("input_files/input_day_4.txt")
     cards = [read_card_from_line(line) for line in lines]
-    cards_copy = cards
-    for card in cards:
-        if card.wins == 0:
-            continue
-        for i in range(card.wins):
-            cards_copy.append(cards[card.id + i])
-    print(len(cards_copy))
+    print(count_total_cards([card.wins for card in cards]))
 
 
 if __name__ == "__main__":
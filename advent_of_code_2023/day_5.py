@@ -104,6 +104,15 @@ ANSWER: 457535844
 
 """
 
+import hashlib
+import os
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from itertools import repeat
+from operator import add
+
 MAPPING_NAMES = [
     "seed-to-soil",
     "soil-to-fertilizer",
@@ -113,6 +122,8 @@ MAPPING_NAMES = [
     "temperature-to-humidity",
     "humidity-to-location",
 ]
+MAX_VALUE = 2**63 - 1
+ALMANAC_CACHE_MAGIC = int.from_bytes(b"ALMANAC2", "little")
 
 
 class MappingRecord:
@@ -131,14 +142,115 @@ class MappingRecord:
         self.destination_name = destination_name
 
     def get_destination_value(self, source_value: int) -> int:
-        if source_value in range(self.start, self.start + self.length):
+        if self.start <= source_value < self.start + self.length:
             return source_value + (self.end - self.start)
         return source_value
 
 
+class ComposedMapping:
+    def __init__(self, segments: list[tuple[int, int, int]]) -> None:
+        self.starts = [start for start, _, _ in segments]
+        self.ends = [end for _, end, _ in segments]
+        self.offsets = [offset for _, _, offset in segments]
+        # Breakpoints with gaps filled as identity: a value's offset is
+        # lookup_offsets[bisect_right(lookup_starts, value)].
+        self.lookup_starts: list[int] = []
+        self.lookup_offsets = [0]
+        for start, end, offset in segments:
+            if self.lookup_starts and self.lookup_starts[-1] == start:
+                self.lookup_offsets[-1] = offset
+            else:
+                self.lookup_starts.append(start)
+                self.lookup_offsets.append(offset)
+            self.lookup_starts.append(end)
+            self.lookup_offsets.append(0)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return f"ComposedMapping with {len(self)} segments"
+
+    def segments(self) -> list[tuple[int, int, int]]:
+        return list(zip(self.starts, self.ends, self.offsets))
+
+    def find_destination(self, seed_number: int) -> int:
+        position = bisect_right(self.starts, seed_number) - 1
+        if position >= 0 and seed_number < self.ends[position]:
+            return seed_number + self.offsets[position]
+        return seed_number
+
+    def find_destinations(self, seeds):
+        # NumPy is optional: an ndarray of seeds can only come from a caller that
+        # already imported it, and then gets an int64 ndarray back.
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(seeds, numpy.ndarray):
+            starts = numpy.array(self.lookup_starts, dtype=numpy.int64)
+            offsets = numpy.array(self.lookup_offsets, dtype=numpy.int64)
+            values = seeds.astype(numpy.int64, copy=False)
+            return values + offsets[numpy.searchsorted(starts, values, side="right")]
+        values = seeds if isinstance(seeds, array) else array("q", seeds)
+        offsets = map(
+            self.lookup_offsets.__getitem__,
+            map(bisect_right, repeat(self.lookup_starts), values),
+        )
+        return array("q", map(add, values, offsets))
+
+
+def get_layer_segments(records: list[MappingRecord]) -> list[tuple[int, int, int]]:
+    # Covers [0, MAX_VALUE) completely; values between records map to themselves.
+    segments = []
+    position = 0
+    for record in sorted(records, key=lambda record: record.start):
+        if record.start > position:
+            segments.append((position, record.start, 0))
+        segments.append(
+            (record.start, record.start + record.length, record.end - record.start)
+        )
+        position = record.start + record.length
+    if position < MAX_VALUE:
+        segments.append((position, MAX_VALUE, 0))
+    return segments
+
+
+def compose_segments(
+    segments: list[tuple[int, int, int]], layer: list[tuple[int, int, int]]
+) -> list[tuple[int, int, int]]:
+    layer_starts = [start for start, _, _ in layer]
+    result: list[tuple[int, int, int]] = []
+    for start, end, offset in segments:
+        image_start = start + offset
+        image_end = end + offset
+        position = bisect_right(layer_starts, image_start) - 1
+        while image_start < image_end:
+            if 0 <= position < len(layer) and image_start < layer[position][1]:
+                piece_end = min(image_end, layer[position][1])
+                piece_offset = offset + layer[position][2]
+            else:
+                piece_end = image_end
+                piece_offset = offset
+            piece = (image_start - offset, piece_end - offset, piece_offset)
+            if result and result[-1][1] == piece[0] and result[-1][2] == piece[2]:
+                piece = (result.pop()[0], piece[1], piece[2])
+            result.append(piece)
+            image_start = piece_end
+            position += 1
+    return result
+
+
 class GlobalMapping:
     def __init__(self, mappings: list) -> None:
         self.mappings = mappings
+        self.record_starts: list[list[int]] | None = None
+        self.composed: ComposedMapping | None = None
+
+    def sort_records(self) -> None:
+        for records in self.mappings:
+            records.sort(key=lambda record: record.start)
+        self.record_starts = [
+            [record.start for record in records] for records in self.mappings
+        ]
+        self.composed = None
 
     def find_destination(self, seed_number: int) -> int:
         print(f"##### SEED NUMBER {seed_number} #####")
@@ -148,16 +260,63 @@ class GlobalMapping:
             result = self.next_mapping(index, result)
         return result
 
-    def next_mapping(self, mapping_index, result: int):
-        for record in self.mappings[mapping_index]:
-            new_result = record.get_destination_value(result)
-            print(f"{new_result=}")
-            if result != new_result:
-                return new_result
-            result = new_result
-
+    def map_intervals(self, intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        for index in range(len(self.mappings)):
+            intervals = merge_intervals(self.next_mapping_intervals(index, intervals))
+        return intervals
+
+    def next_mapping_intervals(
+        self, mapping_index: int, intervals: list[tuple[int, int]]
+    ) -> list[tuple[int, int]]:
+        if self.record_starts is None:
+            self.sort_records()
+        records = self.mappings[mapping_index]
+        starts = self.record_starts[mapping_index]
+        result = []
+        for start, end in intervals:
+            while start < end:
+                position = bisect_right(starts, start) - 1
+                record = records[position] if position >= 0 else None
+                if record and start < record.start + record.length:
+                    piece_end = min(end, record.start + record.length)
+                    offset = record.end - record.start
+                else:
+                    next_start = (
+                        starts[position + 1] if position + 1 < len(starts) else end
+                    )
+                    piece_end = min(end, next_start)
+                    offset = 0
+                result.append((start + offset, piece_end + offset))
+                start = piece_end
         return result
 
+    def find_destinations(self, seeds):
+        # Batch path without per-seed prints: one bisect per seed over the
+        # composed seed-to-location map, built once per GlobalMapping.
+        return self.compose().find_destinations(seeds)
+
+    def compose(self) -> ComposedMapping:
+        if self.composed is None:
+            segments = [(0, MAX_VALUE, 0)]
+            for records in self.mappings:
+                segments = compose_segments(segments, get_layer_segments(records))
+            self.composed = ComposedMapping(segments)
+        return self.composed
+
+    def next_mapping(self, mapping_index, result: int):
+        if self.record_starts is None:
+            self.sort_records()
+        # Records in a layer do not overlap, so the only candidate is the last
+        # record starting at or before the value.
+        position = bisect_right(self.record_starts[mapping_index], result) - 1
+        if position < 0:
+            return result
+        new_result = self.mappings[mapping_index][position].get_destination_value(
+            result
+        )
+        print(f"{new_result=}")
+        return new_result
+
 
 def read_input(file_name: str) -> list[str]:
     with open(file_name, "r") as myfile:
@@ -175,13 +334,29 @@ def read_seeds_from_line(line: str) -> list[int]:
     return [int(item) for item in seeds_str.split()]
 
 
+def get_seed_ranges(seeds: list[int]) -> list[tuple[int, int]]:
+    return [
+        (seeds[index], seeds[index] + seeds[index + 1])
+        for index in range(0, len(seeds) - 1, 2)
+    ]
+
+
+def merge_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    result: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], max(result[-1][1], end))
+        else:
+            result.append((start, end))
+    return result
+
+
 def read_types_from_line(line: str) -> tuple[str, str]:
     instructions = line.split()[0]
     return instructions.split("-")[0], instructions.split("-")[2]
 
 
-def part1():
-    lines = read_input("input_files/input_day_5.txt")
+def read_almanac(lines: list[str]) -> tuple[list[int], GlobalMapping]:
     current_source_type = ""
     current_destination_type = ""
     global_mapping = GlobalMapping(mappings=[[], [], [], [], [], [], []])
@@ -200,11 +375,118 @@ def part1():
             mapping.source_name = current_source_type
             mapping.destination_name = current_destination_type
             global_mapping.mappings[mapping_number].append(mapping)
+    global_mapping.sort_records()
+    return seeds_list, global_mapping
+
+
+def write_compiled_almanac(
+    cache_file: str, seeds_list: list[int], global_mapping: GlobalMapping
+) -> None:
+    # One flat int64 table: a magic/version word, the body length and a checksum
+    # of the body, then seed and layer counts, the seeds, and every layer's
+    # records as (start, end, length) in sorted order.
+    body = array("q", [len(seeds_list), len(global_mapping.mappings)])
+    body.extend(len(records) for records in global_mapping.mappings)
+    body.extend(seeds_list)
+    for records in global_mapping.mappings:
+        for record in records:
+            body.extend((record.start, record.end, record.length))
+    header = [ALMANAC_CACHE_MAGIC, len(body), almanac_checksum(body)]
+    table = array("q", header) + body
+    cache_dir = os.path.dirname(cache_file) or "."
+    os.makedirs(cache_dir, exist_ok=True)
+    # A private temporary file per writer, so concurrent processes never share an
+    # inode and readers only ever see a complete file after os.replace.
+    file_descriptor, temporary_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as myfile:
+            table.tofile(myfile)
+        os.replace(temporary_file, cache_file)
+    except BaseException:
+        os.remove(temporary_file)
+        raise
+
+
+def almanac_checksum(body: array) -> int:
+    digest = hashlib.sha256(body.tobytes()).digest()
+    return int.from_bytes(digest[:8], "little", signed=True)
+
+
+def read_compiled_almanac(cache_file: str) -> tuple[list[int], GlobalMapping]:
+    with open(cache_file, "rb") as myfile:
+        data = myfile.read()
+    table = array("q")
+    if len(data) % table.itemsize:
+        raise ValueError(f"Compiled almanac {cache_file} is truncated")
+    table.frombytes(data)
+    if len(table) < 5 or table[0] != ALMANAC_CACHE_MAGIC:
+        raise ValueError(f"{cache_file} is not a compiled almanac")
+    if table[1] != len(table) - 3:
+        raise ValueError(f"Compiled almanac {cache_file} is truncated")
+    if table[2] != almanac_checksum(table[3:]):
+        raise ValueError(f"Compiled almanac {cache_file} fails its checksum")
+    number_of_seeds, number_of_layers = table[3], table[4]
+    layer_sizes = table[5 : 5 + number_of_layers]
+    if number_of_seeds < 0 or any(size < 0 for size in layer_sizes):
+        raise ValueError(f"Compiled almanac {cache_file} has negative counts")
+    expected_length = 5 + number_of_layers + number_of_seeds + 3 * sum(layer_sizes)
+    if number_of_layers != len(MAPPING_NAMES) or expected_length != len(table):
+        raise ValueError(f"Compiled almanac {cache_file} is corrupt")
+    position = 5 + number_of_layers
+    seeds_list = table[position : position + number_of_seeds].tolist()
+    position += number_of_seeds
+    mappings = []
+    for index, size in enumerate(layer_sizes):
+        source_name, destination_name = read_types_from_line(MAPPING_NAMES[index])
+        records = []
+        for _ in range(size):
+            start, end, length = table[position : position + 3]
+            records.append(
+                MappingRecord(start, end, length, source_name, destination_name)
+            )
+            position += 3
+        mappings.append(records)
+    global_mapping = GlobalMapping(mappings)
+    global_mapping.sort_records()
+    return seeds_list, global_mapping
+
+
+def load_almanac(
+    file_name: str, cache_dir: str | None = None
+) -> tuple[list[int], GlobalMapping]:
+    with open(file_name, "rb") as myfile:
+        data = myfile.read()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(file_name), ".almanac_cache")
+    cache_file = os.path.join(cache_dir, f"{hashlib.sha256(data).hexdigest()}.bin")
+    if os.path.exists(cache_file):
+        try:
+            return read_compiled_almanac(cache_file)
+        except ValueError:
+            pass  # A damaged cache is rebuilt from the input below.
+    lines = [line.strip() for line in data.decode().splitlines()]
+    seeds_list, global_mapping = read_almanac(lines)
+    try:
+        write_compiled_almanac(cache_file, seeds_list, global_mapping)
+    except OSError:
+        pass  # The cache is only an optimisation; the parsed almanac is still valid.
+    return seeds_list, global_mapping
+
+
+def part1():
+    seeds_list, global_mapping = load_almanac("input_files/input_day_5.txt")
     print([global_mapping.find_destination(seed_number) for seed_number in seeds_list])
     print(
         min(global_mapping.find_destination(seed_number) for seed_number in seeds_list)
     )
 
 
+def part2():
+    seeds_list, global_mapping = load_almanac("input_files/input_day_5.txt")
+    locations = global_mapping.map_intervals(get_seed_ranges(seeds_list))
+    print(min(start for start, _ in locations))
+
+
 if __name__ == "__main__":
     part1()
+    part2()
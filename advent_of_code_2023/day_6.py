@@ -67,6 +67,11 @@ How many ways can you beat the record in this one much longer race?
 ANSWER: 36872656
 """
 
+from array import array
+from itertools import repeat
+from math import isqrt
+from operator import mul, sub
+
 
 class Race:
     def __init__(self, total_time: int, distance_record: int) -> None:
@@ -74,13 +79,50 @@ class Race:
         self.distance_record = distance_record
 
     def calculate_number_of_beating_ways(self):
-        number_of_ways_that_dont_beat = 0
-        for i in range(self.total_time):
-            if i * (self.total_time - i) < self.distance_record:
-                number_of_ways_that_dont_beat += 1
-            else:
-                break
-        return self.total_time - 2 * number_of_ways_that_dont_beat + 1
+        return count_beating_ways(self.total_time, self.distance_record)
+
+
+def count_beating_ways(total_time: int, distance_record: int) -> int:
+    # Winning hold times h satisfy h * (total_time - h) > distance_record, i.e. they
+    # lie strictly between the roots of h^2 - total_time * h + distance_record.
+    # isqrt gives the lower root to within one, and exact integer checks fix it.
+    discriminant = total_time * total_time - 4 * distance_record
+    if discriminant < 0:
+        return 0
+    middle = total_time // 2
+    lowest = max((total_time - isqrt(discriminant)) // 2, 0)
+    while lowest <= middle and lowest * (total_time - lowest) <= distance_record:
+        lowest += 1
+    if lowest > middle:
+        return 0
+    while lowest > 0 and (lowest - 1) * (total_time - lowest + 1) > distance_record:
+        lowest -= 1
+    return total_time - 2 * lowest + 1
+
+
+def count_beating_ways_batch(times, distance_records) -> array:
+    # A hold time h wins when |T - 2h| < sqrt(T^2 - 4D), i.e. |T - 2h| is at most
+    # isqrt(discriminant - 1); counting those h only needs the parity of T. The
+    # integer square roots are exact for any size, so no row needs a float path.
+    # Counts always come back as array("q"); a count beyond int64 raises
+    # OverflowError, so use count_beating_ways for races that large.
+    times = list(times)
+    distance_records = list(distance_records)
+    if len(times) != len(distance_records):
+        raise ValueError(
+            f"Got {len(times)} times but {len(distance_records)} distance records"
+        )
+    discriminants = list(
+        map(sub, map(mul, times, times), map(mul, repeat(4), distance_records))
+    )
+    widths = map(
+        min, map(isqrt, map(max, map(sub, discriminants, repeat(1)), repeat(0))), times
+    )
+    counts = [
+        width + 1 - ((width + total_time) & 1) if discriminant > 0 else 0
+        for total_time, discriminant, width in zip(times, discriminants, widths)
+    ]
+    return array("q", counts)
 
 
 def read_input(file_name: str) -> list[str]:
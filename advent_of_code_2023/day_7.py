@@ -82,7 +82,16 @@ Using the new joker rule, find the rank of every hand in your set. What are the
 
 ANSWER: 254837398
 """
+
+import heapq
+import os
+import tempfile
+from array import array
+from collections import Counter
 from enum import Enum
+from functools import reduce
+from itertools import count, product, repeat
+from operator import add, itemgetter, lshift, mul, or_
 
 
 class Strength(Enum):
@@ -128,18 +137,61 @@ CARD_VALUE_MAP_PART_2 = {
 }
 
 
+CARD_ORDER = "23456789TJQKA"
+CARD_CODES = {char: index for index, char in enumerate(CARD_ORDER)}
+
+CARD_CHARS = {value: char for char, value in CARD_VALUE_MAP.items()}
+CARD_CHARS_PART_2 = {value: char for char, value in CARD_VALUE_MAP_PART_2.items()}
+
+STRENGTH_BY_COUNTS = {
+    (5,): Strength.FIVE_OF_A_KIND,
+    (4, 1): Strength.FOUR_OF_A_KIND,
+    (3, 2): Strength.FULL_HOUSE,
+    (3, 1, 1): Strength.THREE_OF_A_KIND,
+    (2, 2, 1): Strength.TWO_PAIR,
+    (2, 1, 1, 1): Strength.ONE_PAIR,
+    (1, 1, 1, 1, 1): Strength.HIGH_CARD,
+}
+
+STRENGTH_TABLES: dict[bool, bytes] = {}
+
+# Summing the squared card counts of a hand gives a distinct total per strength.
+STRENGTH_BY_SQUARE_SUM = {
+    5: Strength.HIGH_CARD,
+    7: Strength.ONE_PAIR,
+    9: Strength.TWO_PAIR,
+    11: Strength.THREE_OF_A_KIND,
+    13: Strength.FULL_HOUSE,
+    17: Strength.FOUR_OF_A_KIND,
+    25: Strength.FIVE_OF_A_KIND,
+}
+STRENGTH_TRANSLATION = bytes(
+    STRENGTH_BY_SQUARE_SUM[total].value if total in STRENGTH_BY_SQUARE_SUM else 0
+    for total in range(256)
+)
+CARD_TRANSLATIONS = {
+    jack_are_jokers: bytes.maketrans(
+        "".join(card_values).encode(), bytes(card_values.values())
+    )
+    for jack_are_jokers, card_values in (
+        (False, CARD_VALUE_MAP),
+        (True, CARD_VALUE_MAP_PART_2),
+    )
+}
+
+
 class Hand:
+    __slots__ = ("value", "bid", "jack_are_jokers", "strength", "sort_key")
+
     def __init__(self, value: str, bid: int, jack_are_jokers=False) -> None:
         self.value = value
         self.bid = bid
         self.jack_are_jokers = jack_are_jokers
         self.strength = self.get_strength()
+        self.sort_key = encode_hand(self.value, self.strength, self.jack_are_jokers)
 
     def get_strength(self) -> Strength:
-        if not self.jack_are_jokers:
-            return calculate_strength_part_1(self.value)
-        else:
-            return calculate_strength_part_2(self.value)
+        return lookup_strength(self.value, self.jack_are_jokers)
 
     def __lt__(self, other) -> bool:
         for index, char in enumerate(self.value):
@@ -172,6 +224,45 @@ class Hand:
         return self.value
 
 
+def hand_code(value: str) -> int:
+    code = 0
+    for char in value:
+        code = code * 13 + CARD_CODES[char]
+    return code
+
+
+def get_strength_table(jack_are_jokers=False) -> bytes:
+    # 13^5 hands fit in one byte each; built on first use and kept per rule set.
+    if jack_are_jokers not in STRENGTH_TABLES:
+        STRENGTH_TABLES[jack_are_jokers] = build_strength_table(jack_are_jokers)
+    return STRENGTH_TABLES[jack_are_jokers]
+
+
+def build_strength_table(jack_are_jokers=False) -> bytes:
+    joker = CARD_CODES["J"] if jack_are_jokers else -1
+    table = bytearray(13**5)
+    strengths: dict[tuple, int] = {}
+    for code, cards in enumerate(product(range(13), repeat=5)):
+        hand = tuple(sorted(cards))
+        if hand not in strengths:
+            strengths[hand] = strength_from_cards(hand, joker).value
+        table[code] = strengths[hand]
+    return bytes(table)
+
+
+def strength_from_cards(cards: tuple, joker: int = -1) -> Strength:
+    jokers = cards.count(joker)
+    counts = sorted(Counter(card for card in cards if card != joker).values())[::-1]
+    if not counts:
+        return Strength.FIVE_OF_A_KIND
+    counts[0] += jokers
+    return STRENGTH_BY_COUNTS[tuple(counts)]
+
+
+def lookup_strength(value: str, jack_are_jokers=False) -> Strength:
+    return Strength(get_strength_table(jack_are_jokers)[hand_code(value)])
+
+
 def calculate_strength_part_1(value: str) -> Strength:
     if len(set(value)) == 1:
         return Strength.FIVE_OF_A_KIND
@@ -244,6 +335,20 @@ def calculate_strength_part_2(initial_value: str) -> Strength:
         return calculate_strength_part_1(initial_value)
 
 
+def encode_hand(value: str, strength: Strength, jack_are_jokers=False) -> int:
+    # Strength above five 4-bit card values, so sorting the integers orders hands
+    # by strength first and then card by card.
+    card_values = CARD_VALUE_MAP_PART_2 if jack_are_jokers else CARD_VALUE_MAP
+    key = strength.value
+    for char in value:
+        key = key << 4 | card_values[char]
+    return key
+
+
+def sort_hands(hands_list: list[Hand]) -> list[Hand]:
+    return sorted(hands_list, key=lambda hand: hand.sort_key)
+
+
 def allocate_hands(hands_list: list[Hand]) -> list:
     result_list: list = [
         [],
@@ -302,18 +407,231 @@ def convert_lines_to_hands_list(lines: list[str], jack_are_jokers=False) -> list
     return [convert_line_to_hand(line, jack_are_jokers) for line in lines]
 
 
+class HandView:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "HandTable", index: int) -> None:
+        self.table = table
+        self.index = index
+
+    @property
+    def value(self) -> str:
+        card_chars = CARD_CHARS_PART_2 if self.table.jack_are_jokers else CARD_CHARS
+        cards = self.table.cards[self.index]
+        return "".join(card_chars[cards >> shift & 15] for shift in (16, 12, 8, 4, 0))
+
+    @property
+    def bid(self) -> int:
+        return self.table.bids[self.index]
+
+    @property
+    def strength(self) -> Strength:
+        return Strength(self.table.strengths[self.index])
+
+    @property
+    def sort_key(self) -> int:
+        return self.table.strengths[self.index] << 20 | self.table.cards[self.index]
+
+    def __repr__(self):
+        return self.value
+
+
+class HandTable:
+    # Parallel columns of packed card values, strengths and bids: about nine
+    # bytes per hand instead of one Hand object each.
+    def __init__(self, jack_are_jokers=False) -> None:
+        self.jack_are_jokers = jack_are_jokers
+        self.cards = array("I")
+        self.strengths = array("B")
+        self.bids = array("I")
+
+    def __len__(self) -> int:
+        return len(self.bids)
+
+    def __getitem__(self, index: int) -> HandView:
+        if not -len(self) <= index < len(self):
+            raise IndexError("hand index out of range")
+        return HandView(self, index % len(self))
+
+    def append(self, value: str, bid: int) -> None:
+        strength = lookup_strength(value, self.jack_are_jokers)
+        self.cards.append(encode_hand(value, strength, self.jack_are_jokers) & 0xFFFFF)
+        self.strengths.append(strength.value)
+        self.bids.append(bid)
+
+    def sort_keys(self):
+        return map(or_, map(lshift, self.strengths, repeat(20)), self.cards)
+
+    def sort(self) -> None:
+        keys = list(self.sort_keys())
+        order = sorted(range(len(self)), key=keys.__getitem__)
+        self.cards = array("I", map(self.cards.__getitem__, order))
+        self.strengths = array("B", map(self.strengths.__getitem__, order))
+        self.bids = array("I", map(self.bids.__getitem__, order))
+
+    def ranks(self) -> array:
+        keys = list(self.sort_keys())
+        ranks = array("I", [0]) * len(self)
+        for rank, index in enumerate(sorted(range(len(self)), key=keys.__getitem__), 1):
+            ranks[index] = rank
+        return ranks
+
+    def winnings(self) -> int:
+        return sum(map(mul, self.bids, self.ranks()))
+
+
+def read_hand_table(lines: list[str], jack_are_jokers=False) -> HandTable:
+    table = HandTable(jack_are_jokers)
+    for line in lines:
+        if line:
+            value, bid = line.split()
+            table.append(value, int(bid))
+    return table
+
+
+def encode_hand_line(line: str, jack_are_jokers=False) -> tuple[int, int]:
+    value, bid = line.split()
+    strength = lookup_strength(value, jack_are_jokers)
+    return encode_hand(value, strength, jack_are_jokers), int(bid)
+
+
+def write_sorted_run(pairs: list[tuple[int, int]], directory: str) -> str:
+    pairs.sort(key=itemgetter(0))
+    run = array("q")
+    for pair in pairs:
+        run.extend(pair)
+    file_descriptor, run_file = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(file_descriptor, "wb") as myfile:
+        run.tofile(myfile)
+    return run_file
+
+
+def read_sorted_run(run_file: str, buffer_pairs: int):
+    with open(run_file, "rb") as myfile:
+        while block := myfile.read(buffer_pairs * 2 * array("q").itemsize):
+            run = array("q")
+            run.frombytes(block)
+            values = iter(run)
+            yield from zip(values, values)
+
+
+def merge_sorted_runs(run_files: list[str], directory: str, buffer_pairs: int) -> str:
+    runs = [read_sorted_run(run_file, buffer_pairs) for run_file in run_files]
+    file_descriptor, merged_file = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(file_descriptor, "wb") as myfile:
+        block = array("q")
+        for pair in heapq.merge(*runs, key=itemgetter(0)):
+            block.extend(pair)
+            if len(block) >= 2 * buffer_pairs:
+                block.tofile(myfile)
+                block = array("q")
+        block.tofile(myfile)
+    for run_file in run_files:
+        os.remove(run_file)
+    return merged_file
+
+
+def rank_hands_external(
+    file_name: str,
+    jack_are_jokers=False,
+    chunk_size: int = 1_000_000,
+    max_open_runs: int = 64,
+    merge_memory: int = 64 * 1024 * 1024,
+) -> int:
+    # Sorted runs of (sort key, bid) pairs go to temporary files. Runs are merged
+    # at most max_open_runs at a time, repeating until one final merge yields the
+    # hands in rank order. Memory is one chunk while sorting and merge_memory,
+    # shared by the open runs' read buffers and the output buffer, while merging.
+    max_open_runs = max(max_open_runs, 2)
+    buffer_pairs = max(merge_memory // ((max_open_runs + 1) * 16), 1)
+    with tempfile.TemporaryDirectory() as directory:
+        run_files = []
+        pairs = []
+        with open(file_name, "r") as myfile:
+            for line in myfile:
+                if not line.strip():
+                    continue
+                pairs.append(encode_hand_line(line, jack_are_jokers))
+                if len(pairs) >= chunk_size:
+                    run_files.append(write_sorted_run(pairs, directory))
+                    pairs = []
+        if pairs:
+            run_files.append(write_sorted_run(pairs, directory))
+        while len(run_files) > max_open_runs:
+            run_files = [
+                merge_sorted_runs(
+                    run_files[index : index + max_open_runs], directory, buffer_pairs
+                )
+                for index in range(0, len(run_files), max_open_runs)
+            ]
+        runs = [read_sorted_run(run_file, buffer_pairs) for run_file in run_files]
+        result = 0
+        for rank, (_, bid) in enumerate(heapq.merge(*runs, key=itemgetter(0)), 1):
+            result += rank * bid
+        return result
+
+
+def load_hand_matrix(file_name: str) -> tuple[bytes, array]:
+    with open(file_name, "rb") as myfile:
+        records = myfile.read().split()
+    return b"".join(records[::2]), array("I", map(int, records[1::2]))
+
+
+def count_card_columns(columns: list[bytes], card_value: int) -> bytes:
+    matches = bytes(int(value == card_value) for value in range(256))
+    return bytes(
+        reduce(
+            lambda total, column: map(add, total, column),
+            (column.translate(matches) for column in columns),
+        )
+    )
+
+
+def hand_matrix_sort_keys(cards: bytes, jack_are_jokers=False) -> array:
+    # Row-major N x 5 card matrix; every step below runs column-wise over all
+    # hands at once, with jokers added to each hand's largest other card count.
+    matrix = cards.translate(CARD_TRANSLATIONS[jack_are_jokers])
+    columns = [matrix[index::5] for index in range(5)]
+    card_values = CARD_VALUE_MAP_PART_2 if jack_are_jokers else CARD_VALUE_MAP
+    joker_value = CARD_VALUE_MAP_PART_2["J"] if jack_are_jokers else None
+    histogram = [
+        count_card_columns(columns, card_value)
+        for card_value in card_values.values()
+        if card_value != joker_value
+    ]
+    square_sums = reduce(
+        lambda total, counts: map(add, total, map(mul, counts, counts)),
+        histogram,
+        repeat(0),
+    )
+    if jack_are_jokers:
+        jokers = count_card_columns(columns, joker_value)
+        largest = bytes(map(max, *histogram))
+        square_sums = map(
+            add,
+            square_sums,
+            map(mul, jokers, map(add, map(add, largest, largest), jokers)),
+        )
+    strengths = bytes(square_sums).translate(STRENGTH_TRANSLATION)
+    keys = map(lshift, strengths, repeat(20))
+    for index, column in enumerate(columns):
+        keys = map(or_, keys, map(lshift, column, repeat(16 - 4 * index)))
+    return array("q", keys)
+
+
+def rank_hands_batch(file_name: str, jack_are_jokers=False) -> int:
+    cards, bids = load_hand_matrix(file_name)
+    keys = hand_matrix_sort_keys(cards, jack_are_jokers)
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return sum(map(mul, map(bids.__getitem__, order), count(1)))
+
+
 def part1():
-    lines = read_input("input_files/input_day_7.txt")
-    hands_list = convert_lines_to_hands_list(lines)
-    result = allocate_hands(hands_list)
-    print(calculate_bids(result))
+    print(rank_hands_batch("input_files/input_day_7.txt"))
 
 
 def part2():
-    lines = read_input("input_files/input_day_7.txt")
-    hands_list = convert_lines_to_hands_list(lines, jack_are_jokers=True)
-    result = allocate_hands(hands_list)
-    print(calculate_bids(result))
+    print(rank_hands_batch("input_files/input_day_7.txt", jack_are_jokers=True))
 
 
 if __name__ == "__main__":
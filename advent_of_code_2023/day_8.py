@@ -71,6 +71,8 @@ Simultaneously start on every node that ends with A. How many steps does it take
 
 """
 
+from array import array
+
 
 class Called:
     def __init__(self, instruction_index: int, direction_number: int) -> None:
@@ -95,6 +97,35 @@ class Node:
         return f"Node {self.value} [{self.left}, {self.right}]"
 
 
+class CompiledNetwork:
+    # Nodes become integer IDs with flat left/right successor tables and the
+    # instructions a 0/1 byte string, so a step is two indexing operations.
+    def __init__(self, nodes_list: list[Node], instructions: str) -> None:
+        self.names = [node.value for node in nodes_list]
+        self.ids = {name: index for index, name in enumerate(self.names)}
+        self.left = array("i", (self.ids[node.left] for node in nodes_list))
+        self.right = array("i", (self.ids[node.right] for node in nodes_list))
+        self.instructions = bytes(instruction == "R" for instruction in instructions)
+        self.ends = bytes(name.endswith("Z") for name in self.names)
+
+    def count_steps(
+        self, node_value: str = "AAA", current_instruction_index=0
+    ) -> tuple[int, str, int]:
+        successors = (self.left, self.right)
+        instructions = self.instructions
+        ends = self.ends
+        node = self.ids[node_value]
+        number_of_directions = 0
+        while True:
+            if current_instruction_index >= len(instructions):
+                current_instruction_index = 0
+            node = successors[instructions[current_instruction_index]][node]
+            number_of_directions += 1
+            current_instruction_index += 1
+            if ends[node]:
+                return number_of_directions, self.names[node], current_instruction_index
+
+
 def find_node_from_value(nodes_list: list[Node], node_value: str) -> Node:
     return [item for item in nodes_list if item.value == node_value][0]
 
@@ -197,7 +228,8 @@ def part1():
     lines = read_input("input_files/input_day_8.txt")
     nodes_list = transform_lines_to_nodes(lines)
     instructions = lines[0]
-    number_of_directions, node_value, _ = execute_part_1(nodes_list, instructions)
+    network = CompiledNetwork(nodes_list, instructions)
+    number_of_directions, node_value, _ = network.count_steps()
     print(f"{number_of_directions=}, {node_value=}")
 
 